@@ -0,0 +1,46 @@
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Drop-in stand-in for ChatGroq that replays predefined replies.
+
+    Each call pops the next ``AIMessage`` from ``responses`` so a turn can be
+    scripted as "call these tools, then answer with this text" without any
+    network access or randomness.
+    """
+
+    responses: list = Field(default_factory=list)
+
+    @property
+    def _llm_type(self):
+        return "scripted"
+
+    def script(self, responses):
+        self.responses = list(responses)
+
+    def bind_tools(self, tools, **kwargs):
+        # Tool schemas are irrelevant to a scripted model; the tool calls are fixed.
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if not self.responses:
+            raise RuntimeError("ScriptedChatModel ran out of scripted responses")
+        return ChatResult(generations=[ChatGeneration(message=self.responses.pop(0))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        # Skip the default thread-pool hop so the model adds no scheduling noise.
+        return self._generate(messages, stop=stop, **kwargs)
+
+
+def turn_responses(turn, turn_index):
+    '''Build the scripted replies for one scenario turn.'''
+    tool_calls = [
+        {"name": call["name"], "args": call.get("args", {}), "id": f"call_{turn_index}_{i}"}
+        for i, call in enumerate(turn.get("tool_calls", []))
+    ]
+    if not tool_calls:
+        return [AIMessage(content=turn["reply"])]
+    return [AIMessage(content="", tool_calls=tool_calls), AIMessage(content=turn["reply"])]
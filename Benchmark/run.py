@@ -0,0 +1,224 @@
+"""Deterministic end-to-end benchmark for the MCP agent loop.
+
+Swaps ChatGroq for a scripted chat model and runs the real ExpenseTracker and
+weather servers over stdio (the weather server talks to a local Open-Meteo
+stand-in), then replays the multi-turn scenarios in ``scenarios.json``.
+The Twitter server is left out since it needs live credentials.
+
+Reports cold-start time, per-turn latency percentiles, tool-call overhead
+(client-side call time minus server handler time, taken from the trace file)
+and peak RSS as JSON:
+
+    python Benchmark/run.py --repeat 5 --output baseline.json
+    python Benchmark/run.py --repeat 5 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Client"))
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from agent import process_message
+from fake_llm import ScriptedChatModel, turn_responses
+from upstream import UpstreamStub
+import tracing
+
+
+def bench_servers(db_path, upstream):
+    '''Server config pointing the real servers at throwaway state.'''
+    def stdio(script, env):
+        return {
+            "transport": "stdio",
+            "command": sys.executable,
+            "args": [os.path.join(ROOT, script)],
+            "env": tracing.inject_env(env),
+        }
+
+    return {
+        "ExpenseTracker": stdio(os.path.join("DatabaseServer", "main.py"), {"EXPENSES_DB_PATH": db_path}),
+        "weather-server": stdio(os.path.join("WeatherServer", "main.py"), upstream.env()),
+    }
+
+
+def percentile(values, pct):
+    '''Nearest-rank percentile of a non-empty list.'''
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def describe(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p90": round(percentile(values, 90), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3),
+    }
+
+
+async def measure_cold_start(servers):
+    '''Time spawning each server and listing its tools, then all of them together.'''
+    timings = {}
+    for name, config in servers.items():
+        start = time.perf_counter()
+        await MultiServerMCPClient({name: dict(config)}).get_tools()
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    start = time.perf_counter()
+    await MultiServerMCPClient({name: dict(config) for name, config in servers.items()}).get_tools()
+    timings["all"] = round((time.perf_counter() - start) * 1000, 3)
+    return timings
+
+
+async def replay(scenarios, servers, repeat):
+    llm = ScriptedChatModel()
+    turns = []
+    for _ in range(repeat):
+        for scenario in scenarios:
+            history = []
+            for index, turn in enumerate(scenario["turns"]):
+                llm.script(turn_responses(turn, index))
+                start = time.perf_counter()
+                reply, tool_logs = await process_message(turn["prompt"], history, llm, servers)
+                elapsed = (time.perf_counter() - start) * 1000
+
+                if reply != turn["reply"]:
+                    raise RuntimeError(f"{scenario['name']} turn {index}: unexpected reply {reply!r}")
+                history.append({"role": "user", "content": turn["prompt"]})
+                history.append({"role": "assistant", "content": reply})
+                turns.append({
+                    "scenario": scenario["name"],
+                    "turn": index,
+                    "tool_calls": len(tool_logs),
+                    "latency_ms": round(elapsed, 3),
+                })
+    return turns
+
+
+def tool_call_overhead(trace_path):
+    '''Pair client ``mcp.call_tool`` spans with the server handler span they parent.'''
+    with open(trace_path, "r", encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+
+    handlers = {s["parent_id"]: s for s in spans if s["name"].startswith("tool.")}
+    calls, overhead = [], []
+    for s in spans:
+        if s["name"] != "mcp.call_tool":
+            continue
+        calls.append(s["duration_ms"])
+        handler = handlers.get(s["span_id"])
+        if handler is not None:
+            overhead.append(s["duration_ms"] - handler["duration_ms"])
+    return calls, overhead
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "client": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "servers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def flatten(report, prefix=""):
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(report, baseline):
+    '''Print the relative change of every numeric metric present in both reports.'''
+    current, previous = flatten(report), flatten(baseline)
+    for key in sorted(current.keys() & previous.keys()):
+        if key.startswith("config.") or key.endswith(".count"):
+            continue
+        old, new = previous[key], current[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{key:45} {old:>12.3f} -> {new:>12.3f}  {change}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic end-to-end benchmark for the MCP agent loop.")
+    parser.add_argument("--scenarios", default=os.path.join(BENCH_DIR, "scenarios.json"))
+    parser.add_argument("--scenario", action="append", help="Only run the named scenario (repeatable).")
+    parser.add_argument("--repeat", type=int, default=3, help="How many times to replay every scenario.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against.")
+    args = parser.parse_args()
+
+    with open(args.scenarios, "r", encoding="utf-8") as f:
+        scenarios = json.load(f)
+    if args.scenario:
+        scenarios = [s for s in scenarios if s["name"] in args.scenario]
+
+    with tempfile.TemporaryDirectory() as tmp, UpstreamStub() as upstream:
+        trace_path = os.path.join(tmp, "traces.jsonl")
+        tracing.configure(service="benchmark", trace_file=trace_path)
+        servers = bench_servers(os.path.join(tmp, "expenses.db"), upstream)
+
+        cold_start = asyncio.run(measure_cold_start(servers))
+        turns = asyncio.run(replay(scenarios, servers, args.repeat))
+        calls, overhead = tool_call_overhead(trace_path)
+        # Release the trace file before the temporary directory is removed
+        tracing.configure(trace_file="")
+
+    report = {
+        "config": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "scenarios": [s["name"] for s in scenarios],
+        },
+        "cold_start_ms": cold_start,
+        "turn_latency_ms": describe([t["latency_ms"] for t in turns]),
+        "turn_latency_by_scenario_ms": {
+            s["name"]: describe([t["latency_ms"] for t in turns if t["scenario"] == s["name"]])
+            for s in scenarios
+        },
+        "tool_call_ms": describe(calls),
+        "tool_call_overhead_ms": describe(overhead),
+        "peak_rss_mb": peak_rss_mb(),
+        "turns": turns,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Startup benchmark for every entry point, based on ``python -X importtime``.
+
+Each entry point is loaded in a fresh interpreter with ``runpy`` under a
+non-``__main__`` name, so module-level work (imports, app and tool
+registration) runs but no server is started. ``Client/main.py`` needs a
+Streamlit runtime, so it is covered by a headless probe of its first render
+(see ``PROBES``). The import tree is parsed from stderr and checked against
+``startup_budgets.json``:
+
+* ``import_ms`` - ceiling for the summed self time of all imports
+* ``wall_ms``   - ceiling for the interpreter's total run time
+* ``deferred``  - modules that must not be imported at startup
+* ``measures``  - what the entry covers (documentation only)
+
+    python Benchmark/startup.py                   # check budgets, exit 1 on regressions
+    python Benchmark/startup.py --update-budgets  # re-baseline time budgets with headroom
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BUDGETS_PATH = os.path.join(BENCH_DIR, "startup_budgets.json")
+
+CLIENT_FIRST_RENDER = "Client/main.py:first-render"
+
+# Streamlit's Client/main.py can't be loaded outside `streamlit run`, so its
+# first render is replayed headlessly as the imports it performs: streamlit,
+# the agent module, and the MCP adapters loaded by the cached tool listing.
+# Spawning the servers for that listing is not part of the measurement.
+PROBES = {
+    CLIENT_FIRST_RENDER: (
+        "Client",
+        "import asyncio\n"
+        "import streamlit\n"
+        "import agent\n"
+        "from langchain_mcp_adapters.client import MultiServerMCPClient\n",
+    ),
+}
+
+ENTRY_POINTS = [
+    "DatabaseServer/main.py",
+    "DatabaseServer/server.py",
+    "WeatherServer/main.py",
+    "WeatherServer/server.py",
+    "Client/agent.py",
+    CLIENT_FIRST_RENDER,
+]
+
+
+def parse_importtime(stderr):
+    '''Return ``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output.'''
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        modules[name] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+def profile(entry_point, env):
+    '''Load one entry point in a fresh interpreter and collect its import tree.'''
+    if entry_point in PROBES:
+        directory, code = PROBES[entry_point]
+        cwd = os.path.join(ROOT, directory)
+    else:
+        path = os.path.join(ROOT, *entry_point.split("/"))
+        code = f"import runpy; runpy.run_path({path!r}, run_name='startup_probe')"
+        cwd = os.path.dirname(path)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{entry_point} failed to load:\n{proc.stderr[-2000:]}")
+    return wall_ms, parse_importtime(proc.stderr)
+
+
+def measure(entry_point, env, runs):
+    walls, totals, modules = [], [], {}
+    # One discarded warm-up run so bytecode caches are in place
+    profile(entry_point, env)
+    for _ in range(runs):
+        wall_ms, modules = profile(entry_point, env)
+        walls.append(wall_ms)
+        totals.append(sum(self_us for self_us, _ in modules.values()) / 1000)
+
+    slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    top_level = [(name, cumulative) for name, (_, cumulative) in slowest if "." not in name][:10]
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(totals), 1),
+        "modules": len(modules),
+        "slowest_imports_ms": {name: round(cumulative / 1000, 1) for name, cumulative in top_level},
+        "imported": sorted(modules),
+    }
+
+
+def check(results, budgets):
+    failures = []
+    for entry_point, result in results.items():
+        budget = budgets.get(entry_point, {})
+        for key in ("import_ms", "wall_ms"):
+            if key in budget and result[key] > budget[key]:
+                failures.append(f"{entry_point}: {key} {result[key]} > budget {budget[key]}")
+        for module in budget.get("deferred", []):
+            if module in result["imported"]:
+                failures.append(f"{entry_point}: imports {module} at startup")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time startup benchmark with tracked budgets.")
+    parser.add_argument("entry_points", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per entry point (median is reported).")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--update-budgets", action="store_true",
+                        help="Rewrite time budgets as measured value times --headroom.")
+    parser.add_argument("--headroom", type=float, default=1.5)
+    args = parser.parse_args()
+
+    with open(BUDGETS_PATH, "r", encoding="utf-8") as f:
+        budgets = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep probes off the real database and trace file
+        env = dict(os.environ)
+        env["EXPENSES_DB_PATH"] = os.path.join(tmp, "expenses.db")
+        env["INXTINCT_TRACE_FILE"] = ""
+        results = {entry_point: measure(entry_point, env, args.runs) for entry_point in args.entry_points}
+
+    failures = check(results, budgets)
+    report = {
+        "python": sys.version.split()[0],
+        "results": {ep: {k: v for k, v in r.items() if k != "imported"} for ep, r in results.items()},
+        "failures": failures,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.update_budgets:
+        for entry_point, result in results.items():
+            budget = budgets.setdefault(entry_point, {})
+            budget["import_ms"] = round(result["import_ms"] * args.headroom)
+            budget["wall_ms"] = round(result["wall_ms"] * args.headroom)
+        with open(BUDGETS_PATH, "w", encoding="utf-8") as f:
+            f.write(json.dumps(budgets, indent=2) + "\n")
+        return
+
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Canned Open-Meteo answers keyed by lower-cased city name.
+CITIES = {
+    "new york": {"name": "New York", "country": "United States", "latitude": 40.71, "longitude": -74.01},
+    "london": {"name": "London", "country": "United Kingdom", "latitude": 51.51, "longitude": -0.13},
+    "paris": {"name": "Paris", "country": "France", "latitude": 48.85, "longitude": 2.35},
+}
+
+
+class OpenMeteoHandler(BaseHTTPRequestHandler):
+    """Answers the geocoding and forecast calls made by the weather server."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == "/v1/search":
+            city = CITIES.get(params.get("name", [""])[0].strip().lower())
+            body = {"results": [city]} if city else {}
+        elif url.path == "/v1/forecast":
+            body = {"current": {"temperature_2m": 18.5, "weather_code": 2}}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UpstreamStub:
+    '''Local Open-Meteo stand-in served from a background thread.'''
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), OpenMeteoHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        return {
+            "OPEN_METEO_GEOCODING_URL": f"{self.base_url}/v1/search",
+            "OPEN_METEO_FORECAST_URL": f"{self.base_url}/v1/forecast",
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
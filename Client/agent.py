@@ -0,0 +1,173 @@
+"""Agent loop shared by the Streamlit UI and the benchmark harness.
+
+Kept free of Streamlit so it can be driven headlessly with any LangChain chat
+model that supports ``bind_tools``. The MCP adapters and LangChain message
+classes are imported inside the functions that need them, so importing this
+module (every Streamlit rerun) stays cheap.
+"""
+import os
+import json
+import sys
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Appended, not inserted, so the server's main.py/server.py never shadow the client's
+sys.path.append(os.path.join(ROOT, "DatabaseServer"))
+from tracing import inject_env, span
+from shards import validate_tenant
+
+# Load environment variables
+load_dotenv()
+
+# Server Configuration (Duplicated in test.py)
+SERVERS = { 
+    "twitter-mcp": {
+      "transport": "stdio",
+      "command": "npx",
+      "args": [
+        "-y",
+        "@enescinar/twitter-mcp"
+      ],
+      "env": {
+        "API_KEY": os.getenv("API_KEY"),
+        "API_SECRET_KEY": os.getenv("API_SECRET_KEY"),
+        "ACCESS_TOKEN": os.getenv("ACCESS_TOKEN"),
+        "ACCESS_TOKEN_SECRET": os.getenv("ACCESS_TOKEN_SECRET")
+      }
+    },
+    "ExpenseTracker": {
+      "transport": "stdio",
+      "command": "uv",
+      "args": [
+        "run",
+        "--with",
+        "fastmcp",
+        "fastmcp",
+        "run",
+        "C:\\Users\\priya\\OneDrive\\Desktop\\Inxtinct\\DatabaseServer\\main.py",
+      ]
+    },
+    "weather-server": {
+      "transport": "stdio",
+      "command": "uv",
+      "args": [
+        "run",
+        "--with",
+        "fastmcp",
+        "--with",
+        "httpx",
+        "fastmcp",
+        "run",
+        "C:\\Users\\priya\\OneDrive\\Desktop\\Inxtinct\\WeatherServer\\main.py"
+      ]
+    }
+}
+
+async def get_mcp_tools():
+    """Fetches tools from MCP servers. 
+    Note: In a production app, we would want to persist the client connection.
+    Here we might reconnect per run to be safe with asyncio loops in Streamlit."""
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+    client = MultiServerMCPClient(SERVERS)
+    tools = await client.get_tools()
+    return tools, client
+
+# Server whose shard is chosen by the session's tenant (see DatabaseServer/shards.py)
+EXPENSE_SERVER = "ExpenseTracker"
+
+def propagate_tenant(client, tenant):
+    """Pin the expense server to the session's tenant through its spawn env.
+    The tenant is never a tool argument, so the LLM can't switch it. It must
+    already be validated: the server refuses to start on an invalid id."""
+    connection = client.connections.get(EXPENSE_SERVER)
+    if tenant and connection is not None and connection.get("transport") == "stdio":
+        connection["env"] = {**(connection.get("env") or {}), "EXPENSES_TENANT": tenant}
+
+def propagate_trace_context(client):
+    """Hand the active trace context to every stdio server of the client.
+    The adapters spawn a fresh server process per tool call, so stamping the
+    env right before a call parents the server's spans under that call."""
+    for connection in client.connections.values():
+        if connection.get("transport") == "stdio":
+            connection["env"] = inject_env(connection.get("env"))
+
+async def process_message(prompt, chat_history, llm, servers=SERVERS, tenant=None):
+    """Run one chat turn: plan with the LLM, call the requested tools, answer.
+    Expenses are read and written in ``tenant``'s shard (``default`` if unset).
+    Returns the reply text and a log line per tool call. Raises ValueError
+    for an invalid tenant before any server is spawned."""
+    if tenant:
+        tenant = validate_tenant(tenant)
+    with span("process_message", history=len(chat_history)):
+        return await _process_message(prompt, chat_history, llm, servers, tenant)
+
+async def _process_message(prompt, chat_history, llm, servers, tenant):
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langchain_core.messages import ToolMessage, HumanMessage, AIMessage
+
+    # Temporarily reconstruct client to get tools and bind them
+    # This is expensive but ensures fresh loop context
+    # Copy each connection so trace context never leaks into the server config
+    client = MultiServerMCPClient({name: dict(config) for name, config in servers.items()})
+    try:
+        propagate_tenant(client, tenant)
+        propagate_trace_context(client)
+        with span("mcp.get_tools") as s:
+            tools = await client.get_tools()
+            s.set(tools=len(tools))
+        named_tools = {tool.name: tool for tool in tools}
+        llm_with_tools = llm.bind_tools(tools)
+        
+        # Prepare history
+        messages = []
+        for msg in chat_history:
+            if msg["role"] == "user":
+                messages.append(HumanMessage(content=msg["content"]))
+            elif msg["role"] == "assistant":
+                # We simplified history for display, but ideally we'd keep ToolMessages too.
+                # For this simple UI, we'll just append previous text.
+                # A more robust history would serialize full message objects.
+                messages.append(AIMessage(content=msg["content"]))
+        
+        messages.append(HumanMessage(content=prompt))
+        
+        # 1. LLM Step
+        with span("llm.invoke", step="plan"):
+            response = await llm_with_tools.ainvoke(messages)
+        
+        tool_results = []
+        
+        # 2. Tool Invocation Step if needed
+        if getattr(response, "tool_calls", None):
+            tool_messages = []
+            for tc in response.tool_calls:
+                selected_tool_name = tc["name"]
+                selected_tool_args = tc.get("args") or {}
+                selected_tool_id = tc["id"]
+                
+                # Update UI with "Thinking/Working..." equivalent
+                # st.toast(f"Running tool: {selected_tool_name}...") 
+                
+                with span("mcp.call_tool", tool=selected_tool_name):
+                    propagate_trace_context(client)
+                    result = await named_tools[selected_tool_name].ainvoke(selected_tool_args)
+                
+                tool_messages.append(
+                    ToolMessage(tool_call_id=selected_tool_id, content=json.dumps(result))
+                )
+                tool_results.append(f"Used {selected_tool_name}: {json.dumps(result)}")
+
+            # 3. Final Response with Tool Outputs
+            with span("llm.invoke", step="final"):
+                final_response = await llm_with_tools.ainvoke(messages + [response, *tool_messages])
+            return final_response.content, tool_results
+        
+        return response.content, tool_results
+
+    finally:
+        # Cleanup if client has close method (MultiServerMCPClient currently doesn't expose explicit close easily in async context unless used as context manager, 
+        # but garbage collection should handle stdio pipes eventually or OS cleaning up orphan processes if main process dies.
+        # For a persistent app, managing lifecycle is critical.)
+        pass
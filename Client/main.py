@@ -1,58 +1,13 @@
 import streamlit as st
 import asyncio
 import os
-import json
-from dotenv import load_dotenv
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_groq import ChatGroq
-from langchain_core.messages import ToolMessage, HumanMessage, AIMessage
+import sys
 
-# Load environment variables
-load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent import SERVERS, process_message, validate_tenant
+from tracing import configure
 
-# Server Configuration (Duplicated from test.py)
-SERVERS = { 
-    "twitter-mcp": {
-      "transport": "stdio",
-      "command": "npx",
-      "args": [
-        "-y",
-        "@enescinar/twitter-mcp"
-      ],
-      "env": {
-        "API_KEY": os.getenv("API_KEY"),
-        "API_SECRET_KEY": os.getenv("API_SECRET_KEY"),
-        "ACCESS_TOKEN": os.getenv("ACCESS_TOKEN"),
-        "ACCESS_TOKEN_SECRET": os.getenv("ACCESS_TOKEN_SECRET")
-      }
-    },
-    "ExpenseTracker": {
-      "transport": "stdio",
-      "command": "uv",
-      "args": [
-        "run",
-        "--with",
-        "fastmcp",
-        "fastmcp",
-        "run",
-        "C:\\Users\\priya\\OneDrive\\Desktop\\Inxtinct\\DatabaseServer\\main.py",
-      ]
-    },
-    "weather-server": {
-      "transport": "stdio",
-      "command": "uv",
-      "args": [
-        "run",
-        "--with",
-        "fastmcp",
-        "--with",
-        "httpx",
-        "fastmcp",
-        "run",
-        "C:\\Users\\priya\\OneDrive\\Desktop\\Inxtinct\\WeatherServer\\main.py"
-      ]
-    }
-}
+configure(service="client")
 
 # Streamlit Page Configuration
 st.set_page_config(layout="wide", page_title="Inxtinct MCP Client")
@@ -152,106 +107,51 @@ st.markdown("""
 # Initialize Session State
 if "messages" not in st.session_state:
     st.session_state.messages = []
+# Expense shard for this session. There is no login here, so this only keeps
+# users apart; a deployment with auth should set it from the signed-in user.
+if "tenant" not in st.session_state:
+    st.session_state.tenant = "default"
 
 @st.cache_resource
 def get_llm():
+    # Imported here so reruns that never reach the LLM don't pay for langchain_groq
+    from langchain_groq import ChatGroq
+
     return ChatGroq(
         model="openai/gpt-oss-20b",
         temperature=0
     )
 
-async def get_mcp_tools():
-    """Fetches tools from MCP servers. 
-    Note: In a production app, we would want to persist the client connection.
-    Here we might reconnect per run to be safe with asyncio loops in Streamlit."""
-    client = MultiServerMCPClient(SERVERS)
-    tools = await client.get_tools()
-    return tools, client
+@st.cache_resource(show_spinner=False)
+def get_tool_names():
+    """Names of the tools exposed by the MCP servers.
+    Listing them spawns every server, so it is done once per process and
+    reruns reuse the cached names. Only plain strings are cached, never the
+    client, so no event loop outlives the call."""
+    from langchain_mcp_adapters.client import MultiServerMCPClient
 
-async def process_message(prompt, chat_history):
-    llm = get_llm()
-    # Temporarily reconstruct client to get tools and bind them
-    # This is expensive but ensures fresh loop context
-    client = MultiServerMCPClient(SERVERS)
-    try:
-        tools = await client.get_tools()
-        named_tools = {tool.name: tool for tool in tools}
-        llm_with_tools = llm.bind_tools(tools)
-        
-        # Prepare history
-        messages = []
-        for msg in chat_history:
-            if msg["role"] == "user":
-                messages.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                # We simplified history for display, but ideally we'd keep ToolMessages too.
-                # For this simple UI, we'll just append previous text.
-                # A more robust history would serialize full message objects.
-                messages.append(AIMessage(content=msg["content"]))
-        
-        messages.append(HumanMessage(content=prompt))
-        
-        # 1. LLM Step
-        response = await llm_with_tools.ainvoke(messages)
-        
-        tool_results = []
-        
-        # 2. Tool Invocation Step if needed
-        if getattr(response, "tool_calls", None):
-            tool_messages = []
-            for tc in response.tool_calls:
-                selected_tool_name = tc["name"]
-                selected_tool_args = tc.get("args") or {}
-                selected_tool_id = tc["id"]
-                
-                # Update UI with "Thinking/Working..." equivalent
-                # st.toast(f"Running tool: {selected_tool_name}...") 
-                
-                result = await named_tools[selected_tool_name].ainvoke(selected_tool_args)
-                
-                tool_messages.append(
-                    ToolMessage(tool_call_id=selected_tool_id, content=json.dumps(result))
-                )
-                tool_results.append(f"Used {selected_tool_name}: {json.dumps(result)}")
-
-            # 3. Final Response with Tool Outputs
-            final_response = await llm_with_tools.ainvoke(messages + [response, *tool_messages])
-            return final_response.content, tool_results
-        
-        return response.content, tool_results
+    async def fetch_tool_names():
+        c = MultiServerMCPClient(SERVERS)
+        t = await c.get_tools()
+        return [tool.name for tool in t]
 
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(fetch_tool_names())
     finally:
-        # Cleanup if client has close method (MultiServerMCPClient currently doesn't expose explicit close easily in async context unless used as context manager, 
-        # but garbage collection should handle stdio pipes eventually or OS cleaning up orphan processes if main process dies.
-        # For a persistent app, managing lifecycle is critical.)
-        pass
+        loop.close()
 
 # Layout: Chat (Left) | Tools (Right)
 chat_col, tools_col = st.columns([0.75, 0.25])
 
 with tools_col:
+    st.text_input("User", key="tenant", help="Expenses are stored separately per user.")
     st.header("Tools")
     st.caption("Available MCP Tools")
     
-    # We fetch tools to display them. 
-    # To avoid re-spawning servers just for listing, we cache the list if possible, or just fetch.
-    # For now, let's fetch.
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        # Just getting tools description
-        # We use a separate quick function or cache this data to avoid heavy startup every time.
-        # But since we can't easily cache async client across reruns safely without robust loop handling:
-        # We will just show a static placeholder or try to fetch if we had a persistent state.
-        # Let's try to fetch live but show a spinner.
         with st.spinner("Loading tools..."):
-            # Simplified tool fetching for display only
-            async def fetch_tool_names():
-                c = MultiServerMCPClient(SERVERS)
-                t = await c.get_tools()
-                return [tool.name for tool in t]
-            
-            tool_names = loop.run_until_complete(fetch_tool_names())
+            tool_names = get_tool_names()
             
             for name in tool_names:
                 st.code(name, language="text")
@@ -273,6 +173,14 @@ with chat_col:
 
 # Main Chat Input (Pinned to Bottom via Streamlit Default + CSS Width Restriction)
 if prompt := st.chat_input("Enter your prompt..."):
+    # An invalid id would make the expense server exit on spawn and fail the whole turn
+    try:
+        tenant = validate_tenant(st.session_state.tenant)
+    except ValueError as e:
+        with chat_col:
+            st.error(f"Invalid user: {e}")
+        st.stop()
+
     # Display User Message
     with chat_col: # Show message in Chat Column
         with st.chat_message("user"):
@@ -290,7 +198,7 @@ if prompt := st.chat_input("Enter your prompt..."):
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
                 
-                response_text, tool_logs = loop.run_until_complete(process_message(prompt, st.session_state.messages[:-1]))
+                response_text, tool_logs = loop.run_until_complete(process_message(prompt, st.session_state.messages[:-1], get_llm(), tenant=tenant))
                 
                 # Append tool logs to response for visibility if desired, or just show final
                 full_response = response_text
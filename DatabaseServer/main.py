@@ -1,31 +1,32 @@
 from fastmcp import FastMCP
+import atexit
 import os
-import sqlite3
+import sys
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "expenses.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tracing import configure, span, traced
+from shards import DEFAULT_TENANT, pool_from_env, validate_tenant
+
+DB_PATH = os.getenv("EXPENSES_DB_PATH", os.path.join(os.path.dirname(__file__), "expenses.db"))
 CATEGORIES_PATH = os.path.join(os.path.dirname(__file__), "categories.json")
 
 mcp = FastMCP("ExpenseTracker")
+configure(service="ExpenseTracker")
 
-def init_db():
-    with sqlite3.connect(DB_PATH) as c:
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS expenses(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                amount REAL NOT NULL,
-                category TEXT NOT NULL,
-                subcategory TEXT DEFAULT '',
-                note TEXT DEFAULT ''
-            )
-        """)
-
-init_db()
+pool = pool_from_env(DB_PATH)
+# Stdio servers live for one session or tool call, so closing on exit is enough
+atexit.register(pool.close_all)
+# The tenant is fixed per server process by whoever spawns it (the client sets
+# it per session). It is deliberately not a tool argument, so the LLM can't be
+# talked into reading or writing another tenant's shard.
+TENANT = validate_tenant(os.getenv("EXPENSES_TENANT", DEFAULT_TENANT))
 
 @mcp.tool()
+@traced("tool.add_expense")
 def add_expense(date, amount, category, subcategory="", note=""):
     '''Add a new expense entry to the database.'''
-    with sqlite3.connect(DB_PATH) as c:
+    with span("sqlite.insert_expense", tenant=TENANT), pool.connect(TENANT) as c:
         cur = c.execute(
             "INSERT INTO expenses(date, amount, category, subcategory, note) VALUES (?,?,?,?,?)",
             (date, amount, category, subcategory, note)
@@ -33,9 +34,10 @@ def add_expense(date, amount, category, subcategory="", note=""):
         return {"status": "ok", "id": cur.lastrowid}
     
 @mcp.tool()
+@traced("tool.list_expenses")
 def list_expenses(start_date, end_date):
     '''List expense entries within an inclusive date range.'''
-    with sqlite3.connect(DB_PATH) as c:
+    with span("sqlite.list_expenses", tenant=TENANT), pool.connect(TENANT) as c:
         cur = c.execute(
             """
             SELECT id, date, amount, category, subcategory, note
@@ -49,9 +51,10 @@ def list_expenses(start_date, end_date):
         return [dict(zip(cols, r)) for r in cur.fetchall()]
 
 @mcp.tool()
+@traced("tool.summarize")
 def summarize(start_date, end_date, category=None):
     '''Summarize expenses by category within an inclusive date range.'''
-    with sqlite3.connect(DB_PATH) as c:
+    with span("sqlite.summarize", tenant=TENANT), pool.connect(TENANT) as c:
         query = (
             """
             SELECT category, SUM(amount) AS total_amount
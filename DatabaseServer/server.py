@@ -1,29 +1,45 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from pydantic import BaseModel
-import sqlite3
+import asyncio
 import os
-import uvicorn
+import secrets
+import sys
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
-app = FastAPI(title="Expense Tracker Server")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tracing import configure, instrument_app, span
+from shards import DEFAULT_TENANT, pool_from_env
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "expenses.db")
+DB_PATH = os.getenv("EXPENSES_DB_PATH", os.path.join(os.path.dirname(__file__), "expenses.db"))
 CATEGORIES_PATH = os.path.join(os.path.dirname(__file__), "categories.json")
 
-def init_db():
-    with sqlite3.connect(DB_PATH) as c:
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS expenses(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                amount REAL NOT NULL,
-                category TEXT NOT NULL,
-                subcategory TEXT DEFAULT '',
-                note TEXT DEFAULT ''
-            )
-        """)
+pool = pool_from_env(DB_PATH)
+
+async def close_idle_shards():
+    # Eviction also happens on access; this sweep covers a quiet server
+    while True:
+        await asyncio.sleep(max(1.0, pool.idle_timeout / 2))
+        await asyncio.to_thread(pool.close_idle)
+
+@asynccontextmanager
+async def lifespan(app):
+    sweeper = asyncio.create_task(close_idle_shards())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        pool.close_all()
 
-init_db()
+app = FastAPI(title="Expense Tracker Server", lifespan=lifespan)
+configure(service="ExpenseTracker-http")
+instrument_app(app)
+
+# /admin/summary reads every tenant's shard and this app listens on 0.0.0.0,
+# so the endpoint is disabled unless a token is configured. Don't expose it
+# beyond trusted networks even then.
+ADMIN_TOKEN = os.getenv("EXPENSES_ADMIN_TOKEN", "")
 
 class Expense(BaseModel):
     date: str
@@ -48,24 +64,32 @@ class SummaryItem(BaseModel):
     category: str
     total_amount: float
 
+class TenantSummaryItem(BaseModel):
+    tenant: str
+    category: str
+    total_amount: float
+    count: int
+
 @app.post("/expenses", response_model=ExpenseResponse)
-def add_expense(expense: Expense):
-    '''Add a new expense entry to the database.'''
+def add_expense(expense: Expense, tenant: str = Query(DEFAULT_TENANT)):
+    '''Add a new expense entry to the tenant's database.'''
     try:
-        with sqlite3.connect(DB_PATH) as c:
+        with span("sqlite.insert_expense", tenant=tenant), pool.connect(tenant) as c:
             cur = c.execute(
                 "INSERT INTO expenses(date, amount, category, subcategory, note) VALUES (?,?,?,?,?)",
                 (expense.date, expense.amount, expense.category, expense.subcategory, expense.note)
             )
             return {"status": "ok", "id": cur.lastrowid}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/expenses", response_model=List[ExpenseItem])
-def list_expenses(start_date: str, end_date: str):
-    '''List expense entries within an inclusive date range.'''
+def list_expenses(start_date: str, end_date: str, tenant: str = Query(DEFAULT_TENANT)):
+    '''List the tenant's expense entries within an inclusive date range.'''
     try:
-        with sqlite3.connect(DB_PATH) as c:
+        with span("sqlite.list_expenses", tenant=tenant), pool.connect(tenant) as c:
             cur = c.execute(
                 """
                 SELECT id, date, amount, category, subcategory, note
@@ -77,14 +101,16 @@ def list_expenses(start_date: str, end_date: str):
             )
             cols = [d[0] for d in cur.description]
             return [dict(zip(cols, r)) for r in cur.fetchall()]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/expenses/summary", response_model=List[SummaryItem])
-def summarize(start_date: str, end_date: str, category: Optional[str] = None):
-    '''Summarize expenses by category within an inclusive date range.'''
+def summarize(start_date: str, end_date: str, category: Optional[str] = None, tenant: str = Query(DEFAULT_TENANT)):
+    '''Summarize the tenant's expenses by category within an inclusive date range.'''
     try:
-        with sqlite3.connect(DB_PATH) as c:
+        with span("sqlite.summarize", tenant=tenant), pool.connect(tenant) as c:
             query = (
                 """
                 SELECT category, SUM(amount) AS total_amount
@@ -103,6 +129,20 @@ def summarize(start_date: str, end_date: str, category: Optional[str] = None):
             cur = c.execute(query, params)
             cols = [d[0] for d in cur.description]
             return [dict(zip(cols, r)) for r in cur.fetchall()]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/summary", response_model=List[TenantSummaryItem])
+def admin_summary(start_date: str, end_date: str, x_admin_token: str = Header("")):
+    '''Per-tenant totals by category across every shard within an inclusive date range.'''
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        return pool.summarize_all(start_date, end_date)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -117,4 +157,7 @@ def get_categories():
          raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    # Only needed to serve; importing the app (tests, ASGI hosts) skips it
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8001)
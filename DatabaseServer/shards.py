@@ -0,0 +1,227 @@
+"""Per-tenant SQLite shards for the expense tracker.
+
+Every tenant gets its own database file, so writes from different tenants no
+longer queue behind one write lock. Open connections are kept in a bounded
+LRU: opening a shard beyond ``max_open`` closes the least recently used idle
+one, and shards untouched for ``idle_timeout`` seconds are closed on the next
+access or by the server's periodic ``close_idle`` sweep. The ``default`` tenant maps to the original ``expenses.db`` so existing
+data stays where it was.
+"""
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import span
+
+DEFAULT_TENANT = "default"
+# Lower-case only: shard files live on case-insensitive filesystems on
+# Windows and macOS, where "Alice" and "alice" would share one file.
+# Always use fullmatch: "$" would also accept a trailing newline.
+TENANT_PATTERN = re.compile(r"[a-z0-9_-]{1,64}")
+
+# Bump SCHEMA_VERSION whenever SCHEMA changes; init_db skips the DDL once a
+# database already carries the current version in PRAGMA user_version.
+SCHEMA_VERSION = 1
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS expenses(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        subcategory TEXT DEFAULT '',
+        note TEXT DEFAULT ''
+    )
+"""
+
+def init_db(c):
+    if c.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+    with c:
+        c.execute(SCHEMA)
+        c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def validate_tenant(tenant):
+    '''Return the lower-cased tenant id, or raise ValueError if it can't name a shard file.'''
+    tenant = (tenant or DEFAULT_TENANT).lower()
+    if not TENANT_PATTERN.fullmatch(tenant):
+        raise ValueError(f"Invalid tenant id {tenant!r}: use 1-64 letters, digits, '-' or '_'")
+    return tenant
+
+
+class _Shard:
+    __slots__ = ("conn", "lock", "last_used", "in_use")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.in_use = 0
+
+
+class ShardPool:
+    '''Bounded LRU of open per-tenant SQLite connections.
+
+    Shards in use are never closed, so the pool can briefly exceed
+    ``max_open`` under load; it is trimmed again as connections are released.
+    '''
+
+    def __init__(self, default_path, shard_dir, max_open=64, idle_timeout=300.0):
+        self.default_path = default_path
+        self.shard_dir = shard_dir
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self._shards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, tenant):
+        tenant = validate_tenant(tenant)
+        if tenant == DEFAULT_TENANT:
+            return self.default_path
+        return os.path.join(self.shard_dir, f"{tenant}.db")
+
+    def tenants(self):
+        '''Every tenant that has a shard on disk.'''
+        found = set()
+        if os.path.exists(self.default_path):
+            found.add(DEFAULT_TENANT)
+        if os.path.isdir(self.shard_dir):
+            for name in os.listdir(self.shard_dir):
+                stem, ext = os.path.splitext(name)
+                if ext == ".db" and TENANT_PATTERN.fullmatch(stem):
+                    found.add(stem)
+        return sorted(found)
+
+    def open_count(self):
+        with self._lock:
+            return len(self._shards)
+
+    def _open(self, tenant):
+        path = self.path_for(tenant)
+        if tenant != DEFAULT_TENANT:
+            os.makedirs(self.shard_dir, exist_ok=True)
+        with span("sqlite.open_shard", tenant=tenant):
+            conn = sqlite3.connect(path, check_same_thread=False)
+            try:
+                # WAL lets other processes (the stdio server, the FastAPI app, an
+                # admin summary) read a shard while this connection writes. Within
+                # this process, access to a shard is serialized by its lock.
+                conn.execute("PRAGMA journal_mode=WAL")
+                init_db(conn)
+            except Exception:
+                conn.close()
+                raise
+        return _Shard(conn)
+
+    def _evict(self, now):
+        '''Close idle shards past their timeout, then trim the LRU to max_open.'''
+        for tenant, shard in list(self._shards.items()):
+            if shard.in_use == 0 and now - shard.last_used > self.idle_timeout:
+                del self._shards[tenant]
+                shard.conn.close()
+        for tenant, shard in list(self._shards.items()):
+            if len(self._shards) <= self.max_open:
+                break
+            if shard.in_use == 0:
+                del self._shards[tenant]
+                shard.conn.close()
+
+    def _claim(self, tenant):
+        '''Mark a cached shard as in use; the caller holds the pool lock.'''
+        shard = self._shards.get(tenant)
+        if shard is not None:
+            self._shards.move_to_end(tenant)
+            shard.in_use += 1
+            self._evict(time.monotonic())
+        return shard
+
+    @contextmanager
+    def connect(self, tenant=None):
+        '''Yield the tenant's connection inside a transaction.
+
+        Access to one shard is serialized by its own lock. The pool lock only
+        guards the LRU bookkeeping; opening a cold shard happens outside it,
+        so a slow open never stalls other tenants.
+        '''
+        tenant = validate_tenant(tenant)
+        with self._lock:
+            shard = self._claim(tenant)
+
+        if shard is None:
+            fresh = self._open(tenant)
+            with self._lock:
+                shard = self._claim(tenant)
+                if shard is None:
+                    self._shards[tenant] = fresh
+                    shard = self._claim(tenant)
+                    fresh = None
+            if fresh is not None:
+                # Another thread opened the same shard first
+                fresh.conn.close()
+
+        try:
+            with shard.lock, shard.conn:
+                yield shard.conn
+        finally:
+            with self._lock:
+                shard.in_use -= 1
+                shard.last_used = time.monotonic()
+                # Shards busy during the last trim may be closable now
+                if len(self._shards) > self.max_open:
+                    self._evict(shard.last_used)
+
+    def close_idle(self):
+        '''Close shards idle past ``idle_timeout``; servers call this periodically.'''
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def close_all(self):
+        '''Close every open shard; called when a server shuts down.'''
+        with self._lock:
+            for shard in self._shards.values():
+                shard.conn.close()
+            self._shards.clear()
+
+    def summarize_all(self, start_date, end_date):
+        '''Per-tenant, per-category totals across every shard.
+
+        Shards are read through short-lived connections so an admin
+        scan doesn't push hot tenants out of the LRU.
+        '''
+        rows = []
+        for tenant in self.tenants():
+            with span("sqlite.summarize_shard", tenant=tenant):
+                c = sqlite3.connect(self.path_for(tenant))
+                try:
+                    cur = c.execute(
+                        """
+                        SELECT category, SUM(amount) AS total_amount, COUNT(*) AS count
+                        FROM expenses
+                        WHERE date BETWEEN ? AND ?
+                        GROUP BY category ORDER BY category ASC
+                        """,
+                        (start_date, end_date)
+                    )
+                    rows.extend(
+                        {"tenant": tenant, "category": category, "total_amount": total, "count": count}
+                        for category, total, count in cur.fetchall()
+                    )
+                finally:
+                    c.close()
+        return rows
+
+
+def pool_from_env(db_path):
+    '''Build the pool the servers share, tuned through EXPENSES_* variables.'''
+    return ShardPool(
+        default_path=db_path,
+        shard_dir=os.getenv("EXPENSES_SHARD_DIR", os.path.join(os.path.dirname(db_path), "shards")),
+        max_open=int(os.getenv("EXPENSES_MAX_OPEN_SHARDS", "64")),
+        idle_timeout=float(os.getenv("EXPENSES_SHARD_IDLE_SECONDS", "300")),
+    )
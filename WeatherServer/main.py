@@ -1,22 +1,34 @@
 from fastmcp import FastMCP
 import httpx
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import configure, span, traced
+
+GEOCODING_URL = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
 
 mcp = FastMCP("weather")
+configure(service="weather")
 
 @mcp.tool()
+@traced("tool.get_weather")
 async def get_weather(city: str) -> str:
     """Get the current weather for a city."""
     async with httpx.AsyncClient() as client:
-        geo_url = "https://geocoding-api.open-meteo.com/v1/search"
+        geo_url = GEOCODING_URL
         geo_params = {"name": city, "count": 1, "language": "en", "format": "json"}
-        geo_resp = await client.get(geo_url, params=geo_params)
+        with span("httpx.geocode", city=city):
+            geo_resp = await client.get(geo_url, params=geo_params)
         geo_data = geo_resp.json()
 
         if not geo_data.get("results"):
             if "," in city:
                 simple_city = city.split(",")[0].strip()
                 geo_params["name"] = simple_city
-                geo_resp = await client.get(geo_url, params=geo_params)
+                with span("httpx.geocode", city=simple_city):
+                    geo_resp = await client.get(geo_url, params=geo_params)
                 geo_data = geo_resp.json()
             
             if not geo_data.get("results"):
@@ -28,13 +40,14 @@ async def get_weather(city: str) -> str:
         name = location["name"]
         country = location.get("country", "")
 
-        weather_url = "https://api.open-meteo.com/v1/forecast"
+        weather_url = FORECAST_URL
         weather_params = {
             "latitude": lat,
             "longitude": lon,
             "current": "temperature_2m,weather_code",
         }
-        weather_resp = await client.get(weather_url, params=weather_params)
+        with span("httpx.forecast"):
+            weather_resp = await client.get(weather_url, params=weather_params)
         weather_data = weather_resp.json()
         
         current = weather_data.get("current", {})
@@ -51,3 +64,6 @@ async def get_weather(city: str) -> str:
         elif code in [95, 96, 99]: conditions = "Thunderstorm"
 
         return f"Weather in {name}, {country}: {temp}°C, {conditions}"
+
+if __name__ == "__main__":
+    mcp.run()
@@ -1,9 +1,17 @@
 from fastapi import FastAPI, HTTPException
-import httpx
-import uvicorn
+import os
+import sys
 from pydantic import BaseModel
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import configure, instrument_app, span
+
+GEOCODING_URL = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+
 app = FastAPI(title="Weather Server")
+configure(service="weather-http")
+instrument_app(app)
 
 class WeatherResponse(BaseModel):
     city: str
@@ -15,12 +23,16 @@ class WeatherResponse(BaseModel):
 @app.get("/weather", response_model=WeatherResponse)
 async def get_weather(city: str):
     """Get the current weather for a city."""
+    # httpx is deferred so server startup doesn't pay for it
+    import httpx
+
     # 1. Geocoding
     async with httpx.AsyncClient() as client:
-        geo_url = "https://geocoding-api.open-meteo.com/v1/search"
+        geo_url = GEOCODING_URL
         geo_params = {"name": city, "count": 1, "language": "en", "format": "json"}
         try:
-            geo_resp = await client.get(geo_url, params=geo_params)
+            with span("httpx.geocode", city=city):
+                geo_resp = await client.get(geo_url, params=geo_params)
             geo_resp.raise_for_status()
             geo_data = geo_resp.json()
         except httpx.HTTPError as e:
@@ -32,7 +44,8 @@ async def get_weather(city: str):
                 simple_city = city.split(",")[0].strip()
                 geo_params["name"] = simple_city
                 try:
-                    geo_resp = await client.get(geo_url, params=geo_params)
+                    with span("httpx.geocode", city=simple_city):
+                        geo_resp = await client.get(geo_url, params=geo_params)
                     geo_data = geo_resp.json()
                 except httpx.HTTPError:
                     pass
@@ -47,14 +60,15 @@ async def get_weather(city: str):
         country = location.get("country", "")
 
         # 2. Weather
-        weather_url = "https://api.open-meteo.com/v1/forecast"
+        weather_url = FORECAST_URL
         weather_params = {
             "latitude": lat,
             "longitude": lon,
             "current": "temperature_2m,weather_code",
         }
         try:
-            weather_resp = await client.get(weather_url, params=weather_params)
+            with span("httpx.forecast"):
+                weather_resp = await client.get(weather_url, params=weather_params)
             weather_resp.raise_for_status()
             weather_data = weather_resp.json()
         except httpx.HTTPError as e:
@@ -85,4 +99,7 @@ async def get_weather(city: str):
         )
 
 if __name__ == "__main__":
+    # Only needed to serve; importing the app (tests, ASGI hosts) skips it
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,331 @@
+"""Lightweight tracing and metrics shared by the client and the MCP servers.
+
+Spans can be appended as JSON lines to a local file so a slow turn can be
+inspected offline. The file exporter is off unless ``INXTINCT_TRACE_FILE``
+names a file; the file is not rotated, so enable it while investigating.
+Trace context crosses process boundaries as a W3C ``traceparent`` string;
+the client hands it to the stdio servers through the ``TRACEPARENT``
+environment variable.
+
+Every finished span is also observed in an in-process latency histogram, and
+the FastAPI servers expose those through ``/metrics`` via ``instrument_app``.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+import warnings
+from contextlib import contextmanager
+
+TRACE_FILE = os.getenv("INXTINCT_TRACE_FILE", "")
+SERVICE_NAME = os.getenv("INXTINCT_SERVICE", "inxtinct")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_span = contextvars.ContextVar("inxtinct_current_span", default=None)
+_export_lock = threading.Lock()
+_export_file = None
+
+
+def configure(service=None, trace_file=None):
+    '''Set the service name stamped on spans and, optionally, the trace file.'''
+    global SERVICE_NAME, TRACE_FILE, _export_file
+    if service:
+        SERVICE_NAME = service
+    if trace_file is not None:
+        with _export_lock:
+            if _export_file is not None:
+                _export_file.close()
+                _export_file = None
+            TRACE_FILE = trace_file
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+_registry = []
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    '''Monotonic counter rendered in the Prometheus text format.'''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    '''Cumulative latency histogram rendered in the Prometheus text format.'''
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series["counts"]):
+                    labels = _format_labels(self.labelnames, key, ("le", repr(float(bound))))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {series['sum']}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+def render_metrics():
+    '''Render every registered metric in the Prometheus text exposition format.'''
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+SPAN_LATENCY = Histogram(
+    "inxtinct_span_duration_seconds", "Duration of traced operations.", ("span", "status")
+)
+HTTP_REQUESTS = Counter(
+    "inxtinct_http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "inxtinct_http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+
+
+# ---------------------------------------------------------------------------
+# Tracing
+# ---------------------------------------------------------------------------
+
+class Span:
+    '''A single timed operation. Attributes can be added while it is open.'''
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes")
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+def parse_traceparent(value):
+    '''Return ``(trace_id, span_id)`` from a W3C traceparent, or ``(None, None)``.'''
+    parts = (value or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_traceparent():
+    '''The traceparent to hand to a downstream process, if any trace is active.'''
+    active = _current_span.get()
+    if active is not None:
+        return active.traceparent
+    return os.getenv("TRACEPARENT") or None
+
+
+def _export(record):
+    '''Append one span to the trace file.
+
+    Exporting is best effort: if the file can't be opened or written, warn
+    once and switch the exporter off rather than failing the traced block.
+    '''
+    global _export_file, TRACE_FILE
+    if not TRACE_FILE:
+        return
+    line = json.dumps(record, default=str)
+    with _export_lock:
+        try:
+            if _export_file is None:
+                _export_file = open(TRACE_FILE, "a", encoding="utf-8")
+            _export_file.write(line + "\n")
+            _export_file.flush()
+        except (OSError, ValueError) as e:
+            warnings.warn(f"Disabling trace export to {TRACE_FILE!r}: {e}", RuntimeWarning)
+            if _export_file is not None:
+                try:
+                    _export_file.close()
+                except OSError:
+                    pass
+                _export_file = None
+            TRACE_FILE = ""
+
+
+@contextmanager
+def span(name, **attributes):
+    '''Time the enclosed block as a child of the active span.
+
+    Without an active span the parent is taken from ``TRACEPARENT`` so that
+    server-side spans join the client's trace.
+    '''
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = parse_traceparent(os.getenv("TRACEPARENT"))
+        trace_id = trace_id or uuid.uuid4().hex
+
+    active = Span(name, trace_id, parent_id, dict(attributes))
+    token = _current_span.set(active)
+    started_at = time.time()
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield active
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _current_span.reset(token)
+        SPAN_LATENCY.observe(duration, span=name, status=status)
+        record = {
+            "service": SERVICE_NAME,
+            "pid": os.getpid(),
+            "name": name,
+            "trace_id": active.trace_id,
+            "span_id": active.span_id,
+            "parent_id": active.parent_id,
+            "start": started_at,
+            "duration_ms": round(duration * 1000, 3),
+            "status": status,
+            "attributes": active.attributes,
+        }
+        if error:
+            record["error"] = error
+        _export(record)
+
+
+def traced(name=None):
+    '''Decorator that wraps a sync or async function in a span.
+
+    ``functools.wraps`` keeps the signature visible, so FastMCP still derives
+    the same tool schema from the wrapped function.
+    '''
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def inject_env(env=None):
+    '''Return a copy of ``env`` carrying the active trace context for a child process.'''
+    env = dict(env or {})
+    traceparent = current_traceparent()
+    if traceparent:
+        env["TRACEPARENT"] = traceparent
+    if TRACE_FILE:
+        env["INXTINCT_TRACE_FILE"] = TRACE_FILE
+    return env
+
+
+def instrument_app(app):
+    '''Trace every request of a FastAPI app and serve ``/metrics``.'''
+    from fastapi import Request
+    from fastapi.responses import PlainTextResponse
+
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        if request.url.path == "/metrics":
+            return await call_next(request)
+
+        method = request.method
+        start = time.perf_counter()
+        status = "500"
+        with span(f"http {method}", path=request.url.path) as active:
+            try:
+                response = await call_next(request)
+                status = str(response.status_code)
+                active.set(status=response.status_code)
+                return response
+            finally:
+                # Unmatched paths share one label so 404 scans can't grow the series set
+                route = getattr(request.scope.get("route"), "path", "<unmatched>")
+                HTTP_LATENCY.observe(time.perf_counter() - start, method=method, route=route)
+                HTTP_REQUESTS.inc(method=method, route=route, status=status)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+    return app